@@ -4,14 +4,67 @@
     order_by='loaded_at'
 ) }}
 
+-- Full forecasts and the historical days written by the backfill, which share the same document shape.
+-- Records written in CDC storage mode are loaded by raw_weather_changes instead.
+WITH documents AS (
+    SELECT content
+    FROM s3(
+            'https://weather-data-{{ env_var("ENVIRONMENT") }}.s3.fr-par.scw.cloud/weather-data-{{ env_var("ENVIRONMENT")}}/weather/*/*.json',
+            '{{ env_var("S3_ACCESS_KEY") }}',
+            '{{ env_var("S3_SECRET_KEY") }}',
+            'RawBLOB',
+            'content String'
+         )
+
+    UNION ALL
+
+    SELECT content
+    FROM s3(
+            'https://weather-data-{{ env_var("ENVIRONMENT") }}.s3.fr-par.scw.cloud/weather-data-{{ env_var("ENVIRONMENT")}}/weather_history/*/*.json',
+            '{{ env_var("S3_ACCESS_KEY") }}',
+            '{{ env_var("S3_SECRET_KEY") }}',
+            'RawBLOB',
+            'content String'
+         )
+
+),
+
+-- Parse each JSON document once on insert into a typed tuple, so downstream models read native columns
+source_data AS (
+    SELECT
+        content,
+        JSONExtract(
+            content,
+            'Tuple(
+                location Tuple(city String, coordinates Tuple(lat Float64, lon Float64)),
+                weather_data Tuple(hourly Tuple(
+                    time Array(String),
+                    temperature_2m Array(Float64),
+                    precipitation Array(Float64),
+                    windspeed_10m Array(Float64)
+                ))
+            )'
+        ) AS document
+    FROM documents
+    WHERE length(content) > 0
+),
+
+parsed AS (
+    SELECT
+        content,
+        tupleElement(document, 'location') AS location,
+        tupleElement(tupleElement(document, 'weather_data'), 'hourly') AS hourly
+    FROM source_data
+)
+
 SELECT
     content as json_content,
+    tupleElement(location, 'city') AS city_name,
+    tupleElement(tupleElement(location, 'coordinates'), 'lat') AS latitude,
+    tupleElement(tupleElement(location, 'coordinates'), 'lon') AS longitude,
+    parseDateTimeBestEffort(tupleElement(hourly, 'time')[1]) AS weather_datetime,
+    tupleElement(hourly, 'temperature_2m')[1] AS temperature_celsius,
+    tupleElement(hourly, 'precipitation')[1] AS precipitation_mm,
+    tupleElement(hourly, 'windspeed_10m')[1] AS wind_speed_ms,
     now() as loaded_at
-FROM s3(
-        'https://weather-data-{{ env_var("ENVIRONMENT") }}.s3.fr-par.scw.cloud/weather-data-{{ env_var("ENVIRONMENT")}}/weather/*/*.json',
-        '{{ env_var("S3_ACCESS_KEY") }}',
-        '{{ env_var("S3_SECRET_KEY") }}',
-        'RawBLOB',
-        'content String'
-     )
-WHERE length(content) > 0
\ No newline at end of file
+FROM parsed
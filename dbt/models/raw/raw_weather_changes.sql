@@ -0,0 +1,98 @@
+{{ config(
+    materialized='table',
+    engine='MergeTree()',
+    order_by=['city_name', 'forecast_time', 'captured_at']
+) }}
+
+-- Records written by the collector in CDC storage mode, one row per forecast value: every value of a
+-- full snapshot, and only the changed values of a change record. Every row also carries the location and
+-- the first hour of the forecast window of its record, so stg_weather can rebuild each run's current values.
+WITH snapshots AS (
+    SELECT
+        JSONExtract(
+            content,
+            'Tuple(
+                city String,
+                captured_at String,
+                location Tuple(coordinates Tuple(lat Float64, lon Float64)),
+                weather_data Tuple(hourly Tuple(
+                    time Array(String),
+                    temperature_2m Array(Nullable(Float64)),
+                    precipitation Array(Nullable(Float64)),
+                    windspeed_10m Array(Nullable(Float64))
+                ))
+            )'
+        ) AS record,
+        tupleElement(tupleElement(record, 'weather_data'), 'hourly') AS hourly
+    FROM s3(
+            'https://weather-data-{{ env_var("ENVIRONMENT") }}.s3.fr-par.scw.cloud/weather-data-{{ env_var("ENVIRONMENT")}}/weather_cdc/*/*/*_snapshot.json',
+            '{{ env_var("S3_ACCESS_KEY") }}',
+            '{{ env_var("S3_SECRET_KEY") }}',
+            'RawBLOB',
+            'content String'
+         )
+    WHERE length(content) > 0
+),
+
+changes AS (
+    SELECT
+        JSONExtract(
+            content,
+            'Tuple(
+                city String,
+                captured_at String,
+                location Tuple(coordinates Tuple(lat Float64, lon Float64)),
+                forecast_start String,
+                changes Array(Tuple(String, String, Nullable(Float64)))
+            )'
+        ) AS record
+    FROM s3(
+            'https://weather-data-{{ env_var("ENVIRONMENT") }}.s3.fr-par.scw.cloud/weather-data-{{ env_var("ENVIRONMENT")}}/weather_cdc/*/*/*_changes.json',
+            '{{ env_var("S3_ACCESS_KEY") }}',
+            '{{ env_var("S3_SECRET_KEY") }}',
+            'RawBLOB',
+            'content String'
+         )
+    WHERE length(content) > 0
+),
+
+forecast_values AS (
+    SELECT
+        tupleElement(record, 'city') AS city_name,
+        tupleElement(record, 'captured_at') AS captured_at,
+        'snapshot' AS record_type,
+        tupleElement(tupleElement(record, 'location'), 'coordinates') AS coordinates,
+        tupleElement(hourly, 'time')[1] AS forecast_start,
+        entry
+    FROM snapshots
+    ARRAY JOIN arrayConcat(
+        arrayMap((t, v) -> (t, 'temperature_2m', v), tupleElement(hourly, 'time'), tupleElement(hourly, 'temperature_2m')),
+        arrayMap((t, v) -> (t, 'precipitation', v), tupleElement(hourly, 'time'), tupleElement(hourly, 'precipitation')),
+        arrayMap((t, v) -> (t, 'windspeed_10m', v), tupleElement(hourly, 'time'), tupleElement(hourly, 'windspeed_10m'))
+    ) AS entry
+
+    UNION ALL
+
+    SELECT
+        tupleElement(record, 'city') AS city_name,
+        tupleElement(record, 'captured_at') AS captured_at,
+        'changes' AS record_type,
+        tupleElement(tupleElement(record, 'location'), 'coordinates') AS coordinates,
+        tupleElement(record, 'forecast_start') AS forecast_start,
+        entry
+    FROM changes
+    ARRAY JOIN tupleElement(record, 'changes') AS entry
+)
+
+SELECT
+    city_name,
+    parseDateTimeBestEffort(captured_at) AS captured_at,
+    record_type,
+    tupleElement(coordinates, 'lat') AS latitude,
+    tupleElement(coordinates, 'lon') AS longitude,
+    parseDateTimeBestEffort(forecast_start) AS forecast_start,
+    parseDateTimeBestEffort(tupleElement(entry, 1)) AS forecast_time,
+    tupleElement(entry, 2) AS variable,
+    tupleElement(entry, 3) AS value,
+    now() as loaded_at
+FROM forecast_values
@@ -7,23 +7,103 @@
 
 WITH source_data AS (
     SELECT
-        json_content,
+        city_name,
+        latitude,
+        longitude,
+        weather_datetime,
+        temperature_celsius,
+        precipitation_mm,
+        wind_speed_ms,
         loaded_at
     FROM {{ ref('raw_weather') }}
     {% if is_incremental() %}
     WHERE loaded_at > (SELECT MAX(loaded_at) FROM {{ this }})
     {% endif %}
+),
+
+-- Runs collected in CDC storage mode, one row per city and capture time, so they keep the same
+-- granularity as the full forecasts in raw_weather
+cdc_runs AS (
+    SELECT
+        city_name,
+        captured_at,
+        any(latitude) AS latitude,
+        any(longitude) AS longitude,
+        any(forecast_start) AS weather_datetime,
+        max(loaded_at) AS loaded_at
+    FROM {{ ref('raw_weather_changes') }}
+    {% if is_incremental() %}
+    WHERE loaded_at > (SELECT MAX(loaded_at) FROM {{ this }})
+    {% endif %}
+    GROUP BY
+        city_name,
+        captured_at
+),
+
+cdc_snapshots AS (
+    SELECT DISTINCT
+        city_name,
+        captured_at AS snapshot_at
+    FROM {{ ref('raw_weather_changes') }}
+    WHERE record_type = 'snapshot'
+),
+
+-- Each run is rebuilt from the latest snapshot at or before it and the changes captured since
+cdc_run_windows AS (
+    SELECT
+        r.city_name AS city_name,
+        r.captured_at AS captured_at,
+        r.latitude AS latitude,
+        r.longitude AS longitude,
+        r.weather_datetime AS weather_datetime,
+        r.loaded_at AS loaded_at,
+        s.snapshot_at AS snapshot_at
+    FROM cdc_runs AS r
+    ASOF INNER JOIN cdc_snapshots AS s
+        ON r.city_name = s.city_name AND r.captured_at >= s.snapshot_at
+),
+
+-- Values of the first forecast hour of each run, as known at its capture time
+cdc_data AS (
+    SELECT
+        w.city_name AS city_name,
+        w.latitude AS latitude,
+        w.longitude AS longitude,
+        w.weather_datetime AS weather_datetime,
+        argMaxIf(v.value, v.captured_at, v.variable = 'temperature_2m') AS temperature_celsius,
+        argMaxIf(v.value, v.captured_at, v.variable = 'precipitation') AS precipitation_mm,
+        argMaxIf(v.value, v.captured_at, v.variable = 'windspeed_10m') AS wind_speed_ms,
+        w.loaded_at AS loaded_at
+    FROM cdc_run_windows AS w
+    INNER JOIN {{ ref('raw_weather_changes') }} AS v
+        ON v.city_name = w.city_name AND v.forecast_time = w.weather_datetime
+    WHERE v.captured_at >= w.snapshot_at AND v.captured_at <= w.captured_at
+    GROUP BY
+        w.city_name,
+        w.captured_at,
+        w.latitude,
+        w.longitude,
+        w.weather_datetime,
+        w.loaded_at
+),
+
+combined AS (
+    SELECT * FROM source_data
+
+    UNION ALL
+
+    SELECT * FROM cdc_data
 )
 
 SELECT
-    JSONExtractString(json_content, 'location', 'city') AS city_name,
-    JSONExtractFloat(json_content, 'location', 'coordinates', 'lat') AS latitude,
-    JSONExtractFloat(json_content, 'location', 'coordinates', 'lon') AS longitude,
-    parseDateTimeBestEffort(JSONExtractString(json_content, 'weather_data', 'hourly', 'time', 1)) AS weather_datetime,
-    toDate(parseDateTimeBestEffort(JSONExtractString(json_content, 'weather_data', 'hourly', 'time', 1))) AS weather_date,
-    toHour(parseDateTimeBestEffort(JSONExtractString(json_content, 'weather_data', 'hourly', 'time', 1))) AS weather_hour,
-    JSONExtractFloat(json_content, 'weather_data', 'hourly', 'temperature_2m', 1) AS temperature_celsius,
-    JSONExtractFloat(json_content, 'weather_data', 'hourly', 'precipitation', 1) AS precipitation_mm,
-    JSONExtractFloat(json_content, 'weather_data', 'hourly', 'windspeed_10m', 1) AS wind_speed_ms,
+    city_name,
+    latitude,
+    longitude,
+    weather_datetime,
+    toDate(weather_datetime) AS weather_date,
+    toHour(weather_datetime) AS weather_hour,
+    temperature_celsius,
+    precipitation_mm,
+    wind_speed_ms,
     loaded_at
-FROM source_data
+FROM combined
@@ -0,0 +1,32 @@
+{{ config(
+    materialized='table',
+    engine='MergeTree()',
+    order_by=['city_name', 'forecast_time', 'variable'],
+    partition_by='toYYYYMM(forecast_time)'
+) }}
+
+-- Latest known forecast per city, rebuilt from CDC snapshots and change records:
+-- for every (city, forecast hour, variable) the most recently captured value wins.
+-- Only the latest snapshot of a city and the changes captured after it are read, older records are superseded.
+WITH latest_snapshots AS (
+    SELECT
+        city_name,
+        max(captured_at) AS snapshot_at
+    FROM {{ ref('raw_weather_changes') }}
+    WHERE record_type = 'snapshot'
+    GROUP BY city_name
+)
+
+SELECT
+    v.city_name AS city_name,
+    v.forecast_time AS forecast_time,
+    v.variable AS variable,
+    argMax(v.value, v.captured_at) AS value,
+    max(v.captured_at) AS captured_at
+FROM {{ ref('raw_weather_changes') }} AS v
+INNER JOIN latest_snapshots AS s ON v.city_name = s.city_name
+WHERE v.captured_at >= s.snapshot_at
+GROUP BY
+    v.city_name,
+    v.forecast_time,
+    v.variable
@@ -0,0 +1,198 @@
+"""
+Benchmark - JSON extraction in the warehouse
+
+Compares the CPU time per million rows of the previous stg_weather model, which called
+JSONExtract* nine times and parseDateTimeBestEffort three times per row, with the single-pass
+typed extraction that raw_weather now does on insert. Keep the expressions below in sync
+with dbt/models/raw/raw_weather.sql.
+"""
+import json
+import logging
+import uuid
+
+from src.data_pipeline.ingestion.clients.clickhouse import ClickhouseClient
+from src.data_pipeline.ingestion.models.clickhouse import ClickhouseServerConfig
+from src.data_pipeline.ingestion.configs.constants import *
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_TABLE = f"{CLICKHOUSE_DATABASE}.benchmark_raw_weather"
+# Each synthetic row is a ~12 KB document, so 100k rows take ~1.2 GB on the shared cluster.
+# Results are scaled to CPU seconds per million rows, so more rows are not needed for a comparison.
+DEFAULT_ROWS = 100_000
+
+MULTI_PASS_QUERY = f"""
+SELECT
+    JSONExtractString(json_content, 'location', 'city') AS city_name,
+    JSONExtractFloat(json_content, 'location', 'coordinates', 'lat') AS latitude,
+    JSONExtractFloat(json_content, 'location', 'coordinates', 'lon') AS longitude,
+    parseDateTimeBestEffort(JSONExtractString(json_content, 'weather_data', 'hourly', 'time', 1)) AS weather_datetime,
+    toDate(parseDateTimeBestEffort(JSONExtractString(json_content, 'weather_data', 'hourly', 'time', 1))) AS weather_date,
+    toHour(parseDateTimeBestEffort(JSONExtractString(json_content, 'weather_data', 'hourly', 'time', 1))) AS weather_hour,
+    JSONExtractFloat(json_content, 'weather_data', 'hourly', 'temperature_2m', 1) AS temperature_celsius,
+    JSONExtractFloat(json_content, 'weather_data', 'hourly', 'precipitation', 1) AS precipitation_mm,
+    JSONExtractFloat(json_content, 'weather_data', 'hourly', 'windspeed_10m', 1) AS wind_speed_ms
+FROM {BENCHMARK_TABLE}
+"""
+
+SINGLE_PASS_QUERY = f"""
+WITH parsed AS (
+    SELECT
+        tupleElement(document, 'location') AS location,
+        tupleElement(tupleElement(document, 'weather_data'), 'hourly') AS hourly
+    FROM (
+        SELECT JSONExtract(
+            json_content,
+            'Tuple(
+                location Tuple(city String, coordinates Tuple(lat Float64, lon Float64)),
+                weather_data Tuple(hourly Tuple(
+                    time Array(String),
+                    temperature_2m Array(Float64),
+                    precipitation Array(Float64),
+                    windspeed_10m Array(Float64)
+                ))
+            )'
+        ) AS document
+        FROM {BENCHMARK_TABLE}
+    )
+),
+
+typed AS (
+    SELECT
+        tupleElement(location, 'city') AS city_name,
+        tupleElement(tupleElement(location, 'coordinates'), 'lat') AS latitude,
+        tupleElement(tupleElement(location, 'coordinates'), 'lon') AS longitude,
+        parseDateTimeBestEffort(tupleElement(hourly, 'time')[1]) AS weather_datetime,
+        tupleElement(hourly, 'temperature_2m')[1] AS temperature_celsius,
+        tupleElement(hourly, 'precipitation')[1] AS precipitation_mm,
+        tupleElement(hourly, 'windspeed_10m')[1] AS wind_speed_ms
+    FROM parsed
+)
+
+SELECT
+    city_name,
+    latitude,
+    longitude,
+    weather_datetime,
+    toDate(weather_datetime) AS weather_date,
+    toHour(weather_datetime) AS weather_hour,
+    temperature_celsius,
+    precipitation_mm,
+    wind_speed_ms
+FROM typed
+"""
+
+
+def _sample_document() -> str:
+    """Build a document shaped like the collector output, with a full 168-hour forecast."""
+    hours = [f"2025-01-{1 + hour // 24:02d}T{hour % 24:02d}:00" for hour in range(168)]
+    document = {
+        "location": {
+            "city": "Amsterdam",
+            "country": "NL",
+            "coordinates": {"lat": 52.374, "lon": 4.8897}
+        },
+        "weather_data": {
+            "latitude": 52.374,
+            "longitude": 4.8897,
+            "hourly_units": {"time": "iso8601", "temperature_2m": "°C", "precipitation": "mm",
+                             "windspeed_10m": "km/h"},
+            "hourly": {
+                "time": hours,
+                "temperature_2m": [round(5 + (hour % 24) * 0.3, 1) for hour in range(168)],
+                "precipitation": [round((hour % 7) * 0.1, 1) for hour in range(168)],
+                "windspeed_10m": [round(10 + (hour % 13) * 0.5, 1) for hour in range(168)]
+            },
+            "city_name": "Amsterdam"
+        }
+    }
+    return json.dumps(document, indent=2)
+
+
+def run_benchmark(client: ClickhouseClient, rows: int = DEFAULT_ROWS, iterations: int = 5) -> dict[str, float]:
+    """
+    Run both extraction variants over synthetic rows and report CPU time per million rows.
+
+    Args:
+        client: Clickhouse client to run the benchmark with
+        rows: Number of synthetic JSON rows to generate (~12 KB each)
+        iterations: Number of times each variant is run, the median is reported
+
+    Returns:
+        Dictionary mapping variant name to median CPU seconds per million rows
+    """
+    run_id = uuid.uuid4().hex[:8]
+    template = _sample_document().replace("\\", "\\\\").replace("'", "\\'")
+
+    client.execute_command(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+    client.execute_command(f"CREATE TABLE {BENCHMARK_TABLE} (json_content String) ENGINE = MergeTree() ORDER BY tuple()")
+    client.execute_command(
+        f"INSERT INTO {BENCHMARK_TABLE} "
+        f"SELECT replaceOne('{template}', '\"city\": \"Amsterdam\"', concat('\"city\": \"City ', toString(number % 1000), '\"')) "
+        f"FROM numbers({rows})"
+    )
+    logger.info(f"Generated {rows} synthetic rows in {BENCHMARK_TABLE}")
+
+    try:
+        variants = {"multi_pass": MULTI_PASS_QUERY, "single_pass": SINGLE_PASS_QUERY}
+        for name, query in variants.items():
+            for _ in range(iterations):
+                # Hash every output column so no extraction can be skipped
+                client.query_to_dataframe(
+                    f"SELECT sum(sipHash64(*)) FROM ({query}) "
+                    f"SETTINGS log_comment = 'json_extraction_benchmark_{run_id}_{name}'"
+                )
+            logger.info(f"Finished {iterations} runs of {name}")
+
+        client.execute_command("SYSTEM FLUSH LOGS")
+        stats = client.query_to_dataframe(f"""
+            SELECT
+                replaceOne(log_comment, 'json_extraction_benchmark_{run_id}_', '') AS variant,
+                median(ProfileEvents['OSCPUVirtualTimeMicroseconds']) / 1e6 AS cpu_seconds,
+                median(query_duration_ms) AS duration_ms
+            FROM system.query_log
+            WHERE type = 'QueryFinish' AND log_comment LIKE 'json_extraction_benchmark_{run_id}_%'
+            GROUP BY variant
+        """)
+    finally:
+        client.execute_command(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+
+    results = {}
+    for _, row in stats.iterrows():
+        results[row["variant"]] = row["cpu_seconds"] * 1_000_000 / rows
+        print(f"{row['variant']}: {results[row['variant']]:.2f} CPU seconds per million rows "
+              f"(median wall time {row['duration_ms']:.0f} ms for {rows} rows)")
+
+    if results.get("single_pass"):
+        print(f"Speed-up: {results['multi_pass'] / results['single_pass']:.1f}x less CPU time")
+
+    return results
+
+
+def main(rows: int = DEFAULT_ROWS, iterations: int = 5) -> dict[str, float]:
+    """
+    Entry point for the JSON extraction benchmark
+
+    Args:
+        rows: Number of synthetic JSON rows to generate (~12 KB each)
+        iterations: Number of times each variant is run
+
+    Returns:
+        Dictionary mapping variant name to median CPU seconds per million rows
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    client = ClickhouseClient(ClickhouseServerConfig(
+        host=CLICKHOUSE_HOST,
+        port=CLICKHOUSE_PORT,
+        username=CLICKHOUSE_USER,
+        password=CLICKHOUSE_PASSWORD
+    ))
+    return run_benchmark(client, rows=rows, iterations=iterations)
+
+
+if __name__ == "__main__":
+    main()
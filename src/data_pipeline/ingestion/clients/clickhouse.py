@@ -57,3 +57,16 @@ class ClickhouseClient:
         except Exception as e:
             logger.error(f"Error executing Clickhouse query: {str(e)}")
             raise
+
+    def execute_command(self, command: str) -> None:
+        """
+        Execute a statement that does not return rows, such as DDL or INSERT ... SELECT.
+
+        Args:
+            command: SQL statement to execute
+        """
+        try:
+            self.client.command(command)
+        except Exception as e:
+            logger.error(f"Error executing Clickhouse command: {str(e)}")
+            raise
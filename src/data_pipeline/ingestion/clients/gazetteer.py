@@ -0,0 +1,223 @@
+"""
+Offline geocoder backed by a local gazetteer file
+"""
+import csv
+import logging
+import math
+import re
+import sys
+import unicodedata
+from array import array
+from typing import Dict, Any, Optional
+
+from src.data_pipeline.ingestion.clients.weather import GeocodingApiClient
+
+# Column positions in a GeoNames-style TSV (e.g. cities1000.txt)
+NAME_COLUMN = 1
+ASCII_NAME_COLUMN = 2
+ALTERNATE_NAMES_COLUMN = 3
+LATITUDE_COLUMN = 4
+LONGITUDE_COLUMN = 5
+FEATURE_CLASS_COLUMN = 6
+COUNTRY_COLUMN = 8
+POPULATION_COLUMN = 14
+
+_SEPARATORS = re.compile(r"[\s\-'’.,()/]+")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a place name for lookup: strip accents, casefold and collapse separators."""
+    if not name.isascii():
+        decomposed = unicodedata.normalize("NFKD", name)
+        name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", name.casefold()).strip()
+
+
+class _KDTree:
+    """Static 3-d tree over points on the unit sphere, stored as an implicitly balanced array."""
+
+    def __init__(self, xs: array, ys: array, zs: array):
+        self._axes = (xs, ys, zs)
+        self._order = array("l", range(len(xs)))
+        self._build(0, len(xs), 0)
+
+    def _build(self, lo: int, hi: int, depth: int) -> None:
+        # The median of each range is its node, the halves on either side are its subtrees
+        if hi - lo <= 1:
+            return
+        axis = self._axes[depth % 3]
+        self._order[lo:hi] = array("l", sorted(self._order[lo:hi], key=axis.__getitem__))
+        mid = (lo + hi) // 2
+        self._build(lo, mid, depth + 1)
+        self._build(mid + 1, hi, depth + 1)
+
+    def nearest(self, point: tuple[float, float, float]) -> int:
+        """Return the index of the stored point closest to the given point."""
+        best_idx, best_dist = -1, math.inf
+        # Each entry holds a subtree range and the squared distance to the plane separating it from the point
+        stack = [(0, len(self._order), 0, 0.0)]
+
+        while stack:
+            lo, hi, depth, plane_dist = stack.pop()
+            if lo >= hi or plane_dist >= best_dist:
+                continue
+            mid = (lo + hi) // 2
+            idx = self._order[mid]
+            dist = sum((point[axis] - self._axes[axis][idx]) ** 2 for axis in range(3))
+            if dist < best_dist:
+                best_idx, best_dist = idx, dist
+
+            axis = depth % 3
+            diff = point[axis] - self._axes[axis][idx]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            # The far side is only visited if the splitting plane is still closer than the best match
+            stack.append((*far, depth + 1, diff * diff))
+            stack.append((*near, depth + 1, 0.0))
+
+        return best_idx
+
+
+def _to_unit_vector(latitude: float, longitude: float) -> tuple[float, float, float]:
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+
+class GazetteerGeocoder:
+    def __init__(self, gazetteer_file: str, fallback_client: Optional[GeocodingApiClient] = None,
+                 feature_classes: tuple[str, ...] = ("P",), include_alternate_names: bool = True):
+        """
+        Initialize the offline geocoder by loading a gazetteer into memory
+
+        Args:
+            gazetteer_file: Path to a GeoNames-style, tab-separated gazetteer file
+            fallback_client: Optional geocoding API client used for names not in the gazetteer
+            feature_classes: GeoNames feature classes to load (default: populated places)
+            include_alternate_names: Whether alternate names are indexed for lookup
+        """
+        self.logger = logging.getLogger(__name__)
+        self.fallback_client = fallback_client
+        self.hits = 0
+        self.misses = 0
+
+        self._names: list[str] = []
+        self._countries: list[str] = []
+        self._latitudes = array("d")
+        self._longitudes = array("d")
+        self._populations = array("q")
+        # Normalized name -> index of the most populous place, globally and per country
+        self._by_name: dict[str, int] = {}
+        self._by_name_country: dict[tuple[str, str], int] = {}
+
+        self._load(gazetteer_file, set(feature_classes), include_alternate_names)
+
+        xs, ys, zs = array("d"), array("d"), array("d")
+        for latitude, longitude in zip(self._latitudes, self._longitudes):
+            x, y, z = _to_unit_vector(latitude, longitude)
+            xs.append(x)
+            ys.append(y)
+            zs.append(z)
+        self._tree = _KDTree(xs, ys, zs)
+
+        self.logger.info(f"Loaded {len(self._names)} places and {len(self._by_name)} names from {gazetteer_file}")
+
+    def _load(self, gazetteer_file: str, feature_classes: set[str], include_alternate_names: bool) -> None:
+        csv.field_size_limit(sys.maxsize)
+        with open(gazetteer_file, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(row) <= POPULATION_COLUMN or row[FEATURE_CLASS_COLUMN] not in feature_classes:
+                    continue
+                try:
+                    latitude = float(row[LATITUDE_COLUMN])
+                    longitude = float(row[LONGITUDE_COLUMN])
+                except ValueError:
+                    continue
+
+                idx = len(self._names)
+                population = int(row[POPULATION_COLUMN] or 0)
+                country = row[COUNTRY_COLUMN].upper()
+                self._names.append(sys.intern(row[NAME_COLUMN]))
+                self._countries.append(sys.intern(country))
+                self._latitudes.append(latitude)
+                self._longitudes.append(longitude)
+                self._populations.append(population)
+
+                names = {row[NAME_COLUMN], row[ASCII_NAME_COLUMN]}
+                if include_alternate_names and row[ALTERNATE_NAMES_COLUMN]:
+                    names.update(row[ALTERNATE_NAMES_COLUMN].split(","))
+                for name in names:
+                    key = normalize_name(name)
+                    if key:
+                        self._index(self._by_name, key, idx, population)
+                        self._index(self._by_name_country, (key, country), idx, population)
+
+    def _index(self, index: dict, key, idx: int, population: int) -> None:
+        # Ambiguous names resolve to the most populous place
+        current = index.get(key)
+        if current is None or population > self._populations[current]:
+            index[key] = idx
+
+    def _place(self, idx: int) -> Dict[str, Any]:
+        return {
+            "name": self._names[idx],
+            "latitude": self._latitudes[idx],
+            "longitude": self._longitudes[idx],
+            "country": self._countries[idx]
+        }
+
+    def lookup(self, city_name: str, country: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a city in the gazetteer only
+
+        Args:
+            city_name: Name of the city, matched ignoring case, accents and punctuation
+            country: Optional country code (e.g., 'NL')
+
+        Returns:
+            Dictionary with geocoding details, or None if the city is not in the gazetteer
+        """
+        key = normalize_name(city_name)
+        idx = self._by_name_country.get((key, country.upper())) if country else self._by_name.get(key)
+        return self._place(idx) if idx is not None else None
+
+    def geocode_city(self, city_name: str, country: str = None) -> list[Dict[str, Any]]:
+        """
+        Get geocoding data for a city from the gazetteer, falling back to the API on a miss
+
+        Args:
+            city_name: Name of the city to geocode
+            country: Optional country code (e.g., 'NL')
+
+        Returns:
+            List with geocoding details in the same format as the geocoding API
+        """
+        place = self.lookup(city_name, country)
+        if place is not None:
+            self.hits += 1
+            return [place]
+
+        self.misses += 1
+        if self.fallback_client is None:
+            self.logger.warning(f"{city_name} not found in gazetteer and no fallback configured")
+            return []
+
+        self.logger.info(f"{city_name} not found in gazetteer, falling back to geocoding API")
+        return self.fallback_client.get_geocode(city_name, country)
+
+    def get_geocode(self, city_name: str, country: str = None) -> list[Dict[str, Any]]:
+        """Alias for geocode_city for compatibility with GeocodingApiClient"""
+        return self.geocode_city(city_name, country)
+
+    def reverse_geocode(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """
+        Find the gazetteer place closest to a coordinate
+
+        Args:
+            latitude: The latitude coordinate
+            longitude: The longitude coordinate
+
+        Returns:
+            Dictionary with details of the nearest place, or None if the gazetteer is empty
+        """
+        if not self._names:
+            return None
+        return self._place(self._tree.nearest(_to_unit_vector(latitude, longitude)))
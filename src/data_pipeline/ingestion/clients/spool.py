@@ -0,0 +1,197 @@
+import gzip
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Any
+
+from src.data_pipeline.ingestion.clients.state import LocalJSONStorage
+from src.data_pipeline.ingestion.clients.storage import ScalewayJSONStorage
+
+RECORD_SUFFIX = ".json.gz"
+LAST_UPLOADED_KEY = "last_uploaded.json"
+
+
+class WeatherSpool:
+    """Local write-ahead spool of compressed JSON records waiting to be uploaded."""
+
+    def __init__(self, spool_dir: str):
+        self.logger = logging.getLogger(__name__)
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, key: str, data: dict[str, Any]) -> Path:
+        """Durably write a record for an object key and return its path."""
+        payload = gzip.compress(json.dumps({"key": key, "data": data}).encode('utf-8'), compresslevel=1)
+        path = self.spool_dir / f"{time.time_ns()}-{uuid.uuid4().hex}{RECORD_SUFFIX}"
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.spool_dir, prefix=".")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        # Persist the rename itself, so the record survives a crash
+        dir_fd = os.open(self.spool_dir, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+        return path
+
+    def read(self, path: Path) -> Optional[dict[str, Any]]:
+        """Read a record, or None if it is missing or corrupt."""
+        try:
+            with gzip.open(path, "rb") as f:
+                return json.loads(f.read().decode('utf-8'))
+        except (OSError, EOFError, json.JSONDecodeError) as e:
+            self.logger.error(f"Error reading spool record {path.name}: {e}")
+            return None
+
+    def remove(self, path: Path) -> None:
+        """Remove a record once it has been uploaded."""
+        path.unlink(missing_ok=True)
+
+    def quarantine(self, path: Path) -> None:
+        """Move an unreadable record aside so it is not replayed again."""
+        path.rename(path.with_name(path.name + ".corrupt"))
+
+    def pending(self) -> list[Path]:
+        """List records that have not been uploaded yet, oldest first."""
+        return sorted(self.spool_dir.glob(f"*{RECORD_SUFFIX}"))
+
+
+class SpoolUploader:
+    """Background thread that drains a WeatherSpool to object storage."""
+
+    _STOP = object()
+
+    def __init__(self, spool: WeatherSpool, storage_client: ScalewayJSONStorage,
+                 max_workers: int = 4, max_retries: int = 5, retry_backoff: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.spool = spool
+        self.storage_client = storage_client
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: queue.Queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._thread = threading.Thread(target=self._run, name="spool-uploader", daemon=True)
+        self.uploaded = 0
+        self.failed = 0
+        self._counter_lock = threading.Lock()
+        # Records for the same key are uploaded one at a time and never older-over-newer. The name of the
+        # last uploaded record per key is persisted next to the spool, so this also holds across restarts.
+        self._key_locks: dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._index_store = LocalJSONStorage(base_dir=str(spool.spool_dir))
+        self._index_lock = threading.Lock()
+        self._last_uploaded: dict[str, str] = {}
+
+    def start(self) -> None:
+        """Start uploading, replaying records left over from a previous run first."""
+        leftovers = self.spool.pending()
+        last_uploaded = self._index_store.get(LAST_UPLOADED_KEY) or {}
+        # Entries older than every spooled record can never supersede one, so they are dropped
+        oldest = leftovers[0].name if leftovers else None
+        self._last_uploaded = {
+            key: name for key, name in last_uploaded.items() if oldest is not None and name > oldest
+        }
+        if len(self._last_uploaded) != len(last_uploaded):
+            self._index_store.store(self._last_uploaded, LAST_UPLOADED_KEY)
+
+        if leftovers:
+            self.logger.info(f"Replaying {len(leftovers)} spooled records from a previous run")
+        for path in leftovers:
+            self._queue.put(path)
+        self._thread.start()
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        """Spool data for an object key and queue it for upload."""
+        self._queue.put(self.spool.write(key, data))
+
+    def close(self) -> int:
+        """
+        Wait until all queued records are uploaded or given up on, then stop.
+
+        Returns:
+            Number of records left in the spool, to be replayed on the next start
+        """
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        left = len(self.spool.pending())
+        self.logger.info(f"Spool uploader stopped: {self.uploaded} uploaded, {self.failed} failed, {left} left in spool")
+        return left
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            if path is self._STOP:
+                break
+            self._executor.submit(self._upload, path)
+
+    def _upload(self, path: Path) -> None:
+        # Runs in the executor, where an unhandled exception would be lost with its future
+        try:
+            record = self.spool.read(path)
+            if record is None or "key" not in record or "data" not in record:
+                self.logger.error(f"Spool record {path.name} is unreadable, moving it aside")
+                self.spool.quarantine(path)
+                with self._counter_lock:
+                    self.failed += 1
+                return
+
+            key = record["key"]
+            with self._counter_lock:
+                key_lock = self._key_locks[key]
+
+            with key_lock:
+                if self._uploaded_newer(key, path):
+                    self.logger.info(f"Dropping spooled record {path.name} for {key}, a newer one was already uploaded")
+                    self.spool.remove(path)
+                    return
+                self._upload_record(path, key, record["data"])
+        except Exception as e:
+            with self._counter_lock:
+                self.failed += 1
+            self.logger.error(f"Error uploading spool record {path.name}: {str(e)}", exc_info=True)
+
+    def _uploaded_newer(self, key: str, path: Path) -> bool:
+        # Record names start with their write time in nanoseconds, so they sort by age
+        last = self._last_uploaded.get(key)
+        return last is not None and last > path.name
+
+    def _mark_uploaded(self, key: str, path: Path) -> None:
+        # Persisted before the record is removed, so a crash in between cannot lose the marker
+        with self._index_lock:
+            self._last_uploaded[key] = path.name
+            self._index_store.store(dict(self._last_uploaded), LAST_UPLOADED_KEY)
+
+    def _upload_record(self, path: Path, key: str, data: dict[str, Any]) -> None:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                if self.storage_client.store(data, key):
+                    self._mark_uploaded(key, path)
+                    self.spool.remove(path)
+                    with self._counter_lock:
+                        self.uploaded += 1
+                    self.logger.debug(f"Uploaded spooled record for {key}")
+                    return
+                self.logger.warning(f"Upload of {key} failed (attempt {attempt}/{self.max_retries})")
+            except Exception as e:
+                self.logger.warning(f"Upload of {key} failed (attempt {attempt}/{self.max_retries}): {str(e)}")
+            if attempt < self.max_retries:
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        # The record stays in the spool and is replayed on the next start
+        with self._counter_lock:
+            self.failed += 1
+        self.logger.error(f"Giving up on uploading {key}, keeping {path.name} in spool")
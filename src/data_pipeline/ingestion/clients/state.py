@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Any
+
+
+class LocalJSONStorage:
+    """Simple client for JSON storage on the local filesystem, used for pipeline state."""
+
+    def __init__(self, base_dir: str):
+        self.logger = logging.getLogger(__name__)
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.base_dir / key
+
+    def store(self, data: dict[str, Any], key: str) -> bool:
+        """Store JSON data atomically, so a crash never leaves a half-written file."""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            self.logger.error(f"Error storing state {key}: {e}")
+            return False
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Get JSON data, or None if the key does not exist."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"Error getting state {key}: {e}")
+            return None
+
+    def delete(self, key: str) -> bool:
+        """Delete JSON data."""
+        try:
+            self._path(key).unlink(missing_ok=True)
+            return True
+        except OSError as e:
+            self.logger.error(f"Error deleting state {key}: {e}")
+            return False
+
+    def list(self, prefix: str = "") -> list:
+        """List keys with optional prefix."""
+        keys = [
+            path.relative_to(self.base_dir).as_posix()
+            for path in self.base_dir.rglob("*")
+            if path.is_file() and not path.name.startswith(".")
+        ]
+        return sorted(key for key in keys if key.startswith(prefix))
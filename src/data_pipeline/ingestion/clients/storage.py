@@ -66,15 +66,34 @@ class ScalewayJSONStorage:
             self.logger.error(f"Error listing objects: {e}")
             return []
 
+    @staticmethod
+    def _city_slug(city: str) -> str:
+        return city.lower().replace(' ', '_')
+
+    def weather_key(self, city: str, date: Optional[str] = None) -> str:
+        """Object key of the weather data for a city, for today unless a date is given."""
+        if not date:
+            date = datetime.now().strftime('%Y-%m-%d')
+        return f"weather/{date}/{self._city_slug(city)}.json"
+
     def store_weather(self, city: str, data: dict[str, Any]) -> bool:
         """Store weather data for a city."""
-        today = datetime.now().strftime('%Y-%m-%d')
-        key = f"weather/{today}/{city.lower().replace(' ', '_')}.json"
+        return self.store(data, self.weather_key(city))
+
+    def weather_cdc_prefix(self, city: str, date: str) -> str:
+        """Key prefix of the change-data-capture records of a city for a date."""
+        return f"weather_cdc/{date}/{self._city_slug(city)}/"
+
+    def weather_cdc_key(self, city: str, record_type: str, captured_at: datetime) -> str:
+        """Object key of a change-data-capture record ("snapshot" or "changes") for a city."""
+        return (f"{self.weather_cdc_prefix(city, captured_at.strftime('%Y-%m-%d'))}"
+                f"{captured_at.strftime('%H%M%S')}_{record_type}.json")
+
+    def store_weather_history(self, city: str, date: str, data: dict[str, Any]) -> bool:
+        """Store one day of historical weather data for a city, partitioned by date."""
+        key = f"weather_history/{date}/{self._city_slug(city)}.json"
         return self.store(data, key)
 
     def get_weather(self, city: str, date: Optional[str] = None) -> Optional[dict[str, Any]]:
         """Get weather data for a city."""
-        if not date:
-            date = datetime.now().strftime('%Y-%m-%d')
-        key = f"weather/{date}/{city.lower().replace(' ', '_')}.json"
-        return self.get(key)
\ No newline at end of file
+        return self.get(self.weather_key(city, date))
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 API clients for geocoding and weather data services
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.data_pipeline.ingestion.clients.base import ApiClient
 
 
@@ -53,7 +53,9 @@ class WeatherApiClient(ApiClient):
             latitude: float,
             longitude: float,
             forecast_days: int = 7,
-            hourly_params: str = "temperature_2m,precipitation,windspeed_10m"
+            hourly_params: str = "temperature_2m,precipitation,windspeed_10m",
+            start_hour: Optional[str] = None,
+            end_hour: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Fetch weather forecast from Weather API.
@@ -63,15 +65,65 @@ class WeatherApiClient(ApiClient):
             longitude: The longitude coordinate
             forecast_days: Number of days to forecast (default: 7)
             hourly_params: Comma-separated weather parameters to get hourly data for
+            start_hour: Optional first hour to fetch (YYYY-MM-DDTHH:MM, GMT). Together with
+                end_hour this replaces forecast_days and limits the hourly block to that window.
+            end_hour: Optional last hour to fetch (YYYY-MM-DDTHH:MM, GMT, inclusive)
 
         Returns:
             Dictionary containing the weather forecast data
         """
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": hourly_params
+        }
+
+        if start_hour and end_hour:
+            params["start_hour"] = start_hour
+            params["end_hour"] = end_hour
+        else:
+            params["forecast_days"] = forecast_days
+
+        return self._make_request(params=params)
+
+
+class WeatherArchiveApiClient(ApiClient):
+    def __init__(self, api_url: str):
+        """
+        Initialize the Weather Archive API client
+
+        Args:
+            api_url: Base URL for the historical weather API
+        """
+        super().__init__(api_url=api_url)
+
+    def get_historical_weather(
+            self,
+            latitude: float,
+            longitude: float,
+            start_date: str,
+            end_date: str,
+            hourly_params: str = "temperature_2m,precipitation,windspeed_10m"
+    ) -> Dict[str, Any]:
+        """
+        Fetch historical hourly weather from the Weather Archive API.
+
+        Args:
+            latitude: The latitude coordinate
+            longitude: The longitude coordinate
+            start_date: First day to fetch (YYYY-MM-DD, inclusive)
+            end_date: Last day to fetch (YYYY-MM-DD, inclusive)
+            hourly_params: Comma-separated weather parameters to get hourly data for
+
+        Returns:
+            Dictionary containing the historical weather data
+        """
         params = {
             "latitude": latitude,
             "longitude": longitude,
             "hourly": hourly_params,
-            "forecast_days": forecast_days
+            "start_date": start_date,
+            "end_date": end_date
         }
 
         return self._make_request(params=params)
@@ -4,6 +4,10 @@ import os
 GEOCODING_API_KEY = os.environ.get("GEOCODING_API_KEY", "")
 GEOCODING_API_URL = "https://api.api-ninjas.com/v1/geocoding"
 WEATHER_API_URL = "https://api.open-meteo.com/v1/forecast"
+WEATHER_ARCHIVE_API_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+# Optional GeoNames-style gazetteer for offline geocoding, the geocoding API is used for misses
+GAZETTEER_FILE = os.environ.get("GAZETTEER_FILE", "")
 
 CLICKHOUSE_HOST = os.environ.get("CLICKHOUSE_HOST", "clickhouse.clickhouse.svc.cluster.local")
 CLICKHOUSE_PORT = int(os.environ.get("CLICKHOUSE_PORT", "8123"))
@@ -15,4 +19,29 @@ CLICKHOUSE_DATABASE = os.environ.get("CLICKHOUSE_DATABASE", "default")
 SCALEWAY_ACCESS_KEY = os.environ.get("SCALEWAY_ACCESS_KEY", "")
 SCALEWAY_SECRET_KEY = os.environ.get("SCALEWAY_SECRET_KEY", "")
 SCALEWAY_ENDPOINT_URL = "https://weather-data-dev.s3.fr-par.scw.cloud"
-SCALEWAY_BUCKET = "weather-data-dev"
\ No newline at end of file
+SCALEWAY_BUCKET = "weather-data-dev"
+
+# Incremental forecast fetching configuration. FORECAST_STATE_DIR must persist between runs (e.g. a mounted
+# volume on the KubernetesExecutor pods), otherwise every delta run falls back to a full fetch.
+FORECAST_DAYS = 7
+FORECAST_REFRESH_HOURS = int(os.environ.get("FORECAST_REFRESH_HOURS", "24"))
+FORECAST_FULL_REFRESH_RUNS = int(os.environ.get("FORECAST_FULL_REFRESH_RUNS", "5"))
+FORECAST_STATE_DIR = os.environ.get("FORECAST_STATE_DIR", "/tmp/weather_forecast_state")
+
+# Forecast change-data-capture storage configuration. CDC_STATE_DIR should be a mounted volume on the
+# KubernetesExecutor pods; when a city's state is missing, it is rebuilt from the records in the bucket instead.
+CDC_STATE_DIR = os.environ.get("CDC_STATE_DIR", "/tmp/weather_cdc_state")
+CDC_SNAPSHOT_INTERVAL = int(os.environ.get("CDC_SNAPSHOT_INTERVAL", "24"))
+CDC_REBUILD_LOOKBACK_DAYS = int(os.environ.get("CDC_REBUILD_LOOKBACK_DAYS", "7"))
+
+# Local write-ahead spool for object storage uploads. SPOOL_DIR must be a mounted volume on the KubernetesExecutor
+# pods, otherwise records that could not be uploaded are lost with the pod instead of being replayed.
+SPOOL_DIR = os.environ.get("SPOOL_DIR", "/tmp/weather_spool")
+SPOOL_UPLOAD_WORKERS = int(os.environ.get("SPOOL_UPLOAD_WORKERS", "4"))
+SPOOL_MAX_RETRIES = int(os.environ.get("SPOOL_MAX_RETRIES", "5"))
+
+# Historical backfill configuration
+BACKFILL_CHUNK_DAYS = int(os.environ.get("BACKFILL_CHUNK_DAYS", "31"))
+BACKFILL_MAX_WORKERS = int(os.environ.get("BACKFILL_MAX_WORKERS", "4"))
+BACKFILL_REQUESTS_PER_SECOND = float(os.environ.get("BACKFILL_REQUESTS_PER_SECOND", "5"))
+BACKFILL_CHECKPOINT_DIR = os.environ.get("BACKFILL_CHECKPOINT_DIR", "/tmp/weather_backfill")
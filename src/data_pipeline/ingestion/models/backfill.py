@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from datetime import date
+
+from src.data_pipeline.ingestion.models.location import Location
+
+@dataclass
+class BackfillUnit:
+    """A single unit of backfill work: one location over one contiguous date range."""
+    location: Location
+    start_date: date
+    end_date: date
+
+    @property
+    def unit_id(self) -> str:
+        """Stable identifier used to checkpoint progress."""
+        return f"{self.location.city_name}|{self.start_date.isoformat()}|{self.end_date.isoformat()}"
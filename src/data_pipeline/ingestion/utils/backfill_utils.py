@@ -0,0 +1,196 @@
+"""
+Utility functions for backfilling historical weather data in parallel.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any
+import logging
+import threading
+import time
+
+from src.data_pipeline.ingestion.clients.state import LocalJSONStorage
+from src.data_pipeline.ingestion.clients.storage import ScalewayJSONStorage
+from src.data_pipeline.ingestion.clients.weather import WeatherArchiveApiClient
+from src.data_pipeline.ingestion.models.backfill import BackfillUnit
+from src.data_pipeline.ingestion.models.location import Location
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly to stay under a global request rate."""
+
+    def __init__(self, requests_per_second: float):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        self.interval = 1.0 / requests_per_second
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self) -> None:
+        """Block until the caller is allowed to make its next request."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def build_backfill_units(locations: list[Location], start_date: date, end_date: date,
+                         chunk_days: int) -> list[BackfillUnit]:
+    """
+    Split a date range for a set of locations into (location, date-chunk) work units.
+
+    Args:
+        locations: Geocoded Location objects to backfill
+        start_date: First day of the backfill (inclusive)
+        end_date: Last day of the backfill (inclusive)
+        chunk_days: Maximum number of days per unit
+
+    Returns:
+        List of BackfillUnit objects, ordered by location and then by date
+    """
+    if end_date < start_date:
+        raise ValueError(f"end_date {end_date} is before start_date {start_date}")
+    if chunk_days < 1:
+        raise ValueError("chunk_days must be at least 1")
+
+    units = []
+    for location in locations:
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+            units.append(BackfillUnit(location=location, start_date=chunk_start, end_date=chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+    return units
+
+
+def split_weather_by_day(weather_data: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """
+    Split a multi-day weather payload into one payload per day of its hourly block.
+
+    Args:
+        weather_data: Weather API response with an "hourly" section
+
+    Returns:
+        Dictionary mapping YYYY-MM-DD dates to weather payloads covering only that day
+    """
+    hourly = weather_data.get("hourly")
+    if not isinstance(hourly, dict) or not hourly.get("time"):
+        return {}
+
+    day_ranges: dict[str, list[int]] = {}
+    for idx, timestamp in enumerate(hourly["time"]):
+        day = timestamp[:10]
+        if day in day_ranges:
+            day_ranges[day][1] = idx + 1
+        else:
+            day_ranges[day] = [idx, idx + 1]
+
+    per_day = {}
+    for day, (start, end) in day_ranges.items():
+        day_data = {key: value for key, value in weather_data.items() if key != "hourly"}
+        day_data["hourly"] = {key: values[start:end] for key, values in hourly.items()}
+        per_day[day] = day_data
+
+    return per_day
+
+
+def _backfill_unit(unit: BackfillUnit, archive_client: WeatherArchiveApiClient,
+                   storage_client: ScalewayJSONStorage, rate_limiter: RateLimiter) -> int:
+    """Fetch one unit from the archive API and store it per day. Returns the number of days stored."""
+    location = unit.location
+    rate_limiter.acquire()
+    weather_data = archive_client.get_historical_weather(
+        latitude=location.latitude,
+        longitude=location.longitude,
+        start_date=unit.start_date.isoformat(),
+        end_date=unit.end_date.isoformat()
+    )
+
+    per_day = split_weather_by_day(weather_data)
+    if not per_day:
+        raise ValueError(f"Archive response for {unit.unit_id} has no hourly data")
+
+    for day, day_data in per_day.items():
+        day_data["city_name"] = location.city_name
+        result = {
+            "location": {
+                "city": location.city_name,
+                "country": location.country or "Unknown",
+                "coordinates": {
+                    "lat": location.latitude,
+                    "lon": location.longitude
+                }
+            },
+            "weather_data": day_data
+        }
+        if not storage_client.store_weather_history(location.city_name, day, result):
+            raise IOError(f"Failed to store {location.city_name} for {day}")
+
+    return len(per_day)
+
+
+def run_backfill(units: list[BackfillUnit], archive_client: WeatherArchiveApiClient,
+                 storage_client: ScalewayJSONStorage, checkpoint_store: LocalJSONStorage,
+                 checkpoint_key: str, max_workers: int, rate_limiter: RateLimiter) -> dict[str, int]:
+    """
+    Run backfill units in parallel, checkpointing every completed unit.
+
+    Units already recorded in the checkpoint are skipped, so an interrupted backfill
+    resumes where it stopped when it is started again with the same arguments.
+
+    Args:
+        units: Work units to process
+        archive_client: API client for the historical weather service
+        storage_client: Object storage client to write the daily payloads to
+        checkpoint_store: Local store holding the checkpoint
+        checkpoint_key: Key of the checkpoint for this backfill
+        max_workers: Number of units fetched concurrently
+        rate_limiter: Global rate limiter shared by all workers
+
+    Returns:
+        Dictionary with counts of completed, skipped and failed units and stored days
+    """
+    checkpoint = checkpoint_store.get(checkpoint_key) or {"completed": []}
+    completed = set(checkpoint["completed"])
+    pending = [unit for unit in units if unit.unit_id not in completed]
+
+    summary = {"completed": 0, "skipped": len(units) - len(pending), "failed": 0, "days": 0}
+    logger.info(f"Backfill has {len(units)} units, {summary['skipped']} already completed")
+
+    checkpoint_lock = threading.Lock()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(_backfill_unit, unit, archive_client, storage_client, rate_limiter): unit
+            for unit in pending
+        }
+        for future in as_completed(futures):
+            unit = futures[future]
+            try:
+                days = future.result()
+            except Exception as e:
+                summary["failed"] += 1
+                logger.error(f"Backfill unit {unit.unit_id} failed: {str(e)}")
+                continue
+
+            with checkpoint_lock:
+                completed.add(unit.unit_id)
+                checkpoint_store.store({"completed": sorted(completed)}, checkpoint_key)
+            summary["completed"] += 1
+            summary["days"] += days
+            logger.info(f"Backfilled {unit.unit_id} ({days} days), "
+                        f"{len(completed)}/{len(units)} units done")
+    except KeyboardInterrupt:
+        logger.warning("Backfill interrupted, progress has been checkpointed")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+    logger.info(f"Backfill finished: {summary}")
+    return summary
@@ -0,0 +1,186 @@
+"""
+Utility functions for storing weather forecasts as change-data-capture records.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Optional
+import logging
+
+from src.data_pipeline.ingestion.clients.state import LocalJSONStorage
+from src.data_pipeline.ingestion.clients.storage import ScalewayJSONStorage
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def diff_hourly(previous_hourly: dict[str, list], current_hourly: dict[str, list]) -> list[list]:
+    """
+    Diff two hourly forecast blocks.
+
+    Hours that are only in the previous block (they have moved into the past) are not reported.
+
+    Args:
+        previous_hourly: "hourly" section of the previous forecast
+        current_hourly: "hourly" section of the new forecast
+
+    Returns:
+        List of [timestamp, variable, value] entries that are new or changed in the current block
+    """
+    previous_values = {}
+    for variable, values in previous_hourly.items():
+        if variable == "time":
+            continue
+        for timestamp, value in zip(previous_hourly["time"], values):
+            previous_values[(timestamp, variable)] = value
+
+    changes = []
+    for variable, values in current_hourly.items():
+        if variable == "time":
+            continue
+        for timestamp, value in zip(current_hourly["time"], values):
+            key = (timestamp, variable)
+            if key not in previous_values or previous_values[key] != value:
+                changes.append([timestamp, variable, value])
+
+    return changes
+
+
+def apply_changes(hourly: dict[str, list], changes: list[list]) -> dict[str, list]:
+    """
+    Apply change entries to an hourly forecast block.
+
+    Args:
+        hourly: "hourly" section of a forecast
+        changes: List of [timestamp, variable, value] entries, as returned by diff_hourly
+
+    Returns:
+        New hourly block with the changed values, including hours that were not in the block yet
+    """
+    values = {variable: dict(zip(hourly["time"], series)) for variable, series in hourly.items() if variable != "time"}
+    for timestamp, variable, value in changes:
+        values.setdefault(variable, {})[timestamp] = value
+
+    times = sorted({timestamp for series in values.values() for timestamp in series} | set(hourly["time"]))
+    rebuilt = {"time": times}
+    for variable, series in values.items():
+        rebuilt[variable] = [series.get(timestamp) for timestamp in times]
+    return rebuilt
+
+
+def rebuild_weather_cdc_state(storage_client: ScalewayJSONStorage, city: str, captured_at: datetime,
+                              lookback_days: int) -> Optional[dict[str, Any]]:
+    """
+    Rebuild a city's CDC state from the records in object storage.
+
+    The latest snapshot is looked up under weather_cdc/<date>/<city>/, going back at most
+    lookback_days from captured_at, and the change records stored after it are applied in order.
+
+    Args:
+        storage_client: Object storage client the CDC records were written to
+        city: Name of the city
+        captured_at: Capture time of the new forecast
+        lookback_days: Number of days to look back for the latest snapshot
+
+    Returns:
+        The rebuilt state, or None if no snapshot was found or a record could not be read
+    """
+    change_keys = []
+    snapshot_key = None
+    for days_back in range(lookback_days + 1):
+        date = (captured_at - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        # Keys end in <HHMMSS>_<type>.json, so they sort by capture time within a date
+        for key in sorted(storage_client.list(storage_client.weather_cdc_prefix(city, date)), reverse=True):
+            if key.endswith("_snapshot.json"):
+                snapshot_key = key
+                break
+            if key.endswith("_changes.json"):
+                change_keys.append(key)
+        if snapshot_key is not None:
+            break
+
+    if snapshot_key is None:
+        logger.info(f"No CDC snapshot for {city} in the last {lookback_days} days")
+        return None
+
+    snapshot = storage_client.get(snapshot_key)
+    hourly = snapshot.get("weather_data", {}).get("hourly") if snapshot else None
+    if not isinstance(hourly, dict) or "time" not in hourly:
+        logger.warning(f"Could not read CDC snapshot {snapshot_key} for {city}")
+        return None
+
+    for key in reversed(change_keys):
+        record = storage_client.get(key)
+        if record is None or "changes" not in record:
+            logger.warning(f"Could not read CDC change record {key} for {city}")
+            return None
+        hourly = apply_changes(hourly, record["changes"])
+
+    logger.info(f"Rebuilt CDC state for {city} from {snapshot_key} and {len(change_keys)} change records")
+    return {"hourly": hourly, "changes_since_snapshot": len(change_keys)}
+
+
+def _cdc_state_key(city: str) -> str:
+    return f"cdc/{city.lower().replace(' ', '_')}.json"
+
+
+def prepare_weather_cdc(state_store: LocalJSONStorage, city: str, result: dict[str, Any],
+                        snapshot_interval: int, captured_at: Optional[datetime] = None,
+                        storage_client: Optional[ScalewayJSONStorage] = None,
+                        lookback_days: int = 7) -> tuple[str, Optional[dict[str, Any]], dict[str, Any]]:
+    """
+    Build the change-data-capture record for a new forecast of a city.
+
+    A full snapshot is written when there is no previous forecast for the city, or after
+    snapshot_interval change records, so consumers can compact the changes periodically.
+    Otherwise only the changed (timestamp, variable, value) entries are recorded.
+
+    Args:
+        state_store: Local store with the previous forecast per city
+        city: Name of the city
+        result: Collected weather result, with the forecast under weather_data.hourly
+        snapshot_interval: Number of change records between two full snapshots
+        captured_at: Capture time of the forecast (default: now)
+        storage_client: Optional object storage client to rebuild the previous forecast from
+            when it is not in the local store
+        lookback_days: Number of days to look back for a snapshot when rebuilding
+
+    Returns:
+        Tuple of the record type ("snapshot" or "changes"), the record to store (None when
+        nothing changed) and the new state to save once the record is stored
+    """
+    captured_at = captured_at or datetime.now()
+    hourly = result.get("weather_data", {}).get("hourly")
+    if not isinstance(hourly, dict) or "time" not in hourly:
+        raise ValueError(f"Weather data for {city} has no hourly block to capture")
+
+    state = state_store.get(_cdc_state_key(city))
+    if state is None and storage_client is not None:
+        state = rebuild_weather_cdc_state(storage_client, city, captured_at, lookback_days)
+    previous_hourly = state.get("hourly") if state else None
+    changes_since_snapshot = state.get("changes_since_snapshot", 0) if state else 0
+
+    if previous_hourly is None or changes_since_snapshot >= snapshot_interval \
+            or set(previous_hourly) != set(hourly):
+        record = dict(result)
+        record.update({"type": "snapshot", "city": city, "captured_at": captured_at.isoformat(timespec='seconds')})
+        return "snapshot", record, {"hourly": hourly, "changes_since_snapshot": 0}
+
+    changes = diff_hourly(previous_hourly, hourly)
+    if not changes:
+        return "changes", None, state
+
+    record = {
+        "type": "changes",
+        "city": city,
+        "captured_at": captured_at.isoformat(timespec='seconds'),
+        "location": result.get("location"),
+        # First hour of the forecast window, so the warehouse can rebuild each run's current values
+        "forecast_start": hourly["time"][0] if hourly["time"] else None,
+        "changes": changes
+    }
+    logger.debug(f"Captured {len(changes)} changed values for {city}")
+    return "changes", record, {"hourly": hourly, "changes_since_snapshot": changes_since_snapshot + 1}
+
+
+def save_weather_cdc_state(state_store: LocalJSONStorage, city: str, state: dict[str, Any]) -> bool:
+    """Save the forecast a city's next change record is diffed against."""
+    return state_store.store(state, _cdc_state_key(city))
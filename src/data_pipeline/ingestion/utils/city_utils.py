@@ -2,10 +2,12 @@
 Utility functions for working with city data.
 """
 from pathlib import Path
+from typing import Union
 import logging
 
 from src.data_pipeline.ingestion.models.location import Location
 from src.data_pipeline.ingestion.clients.weather import GeocodingApiClient
+from src.data_pipeline.ingestion.clients.gazetteer import GazetteerGeocoder
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -40,10 +42,13 @@ def get_dutch_cities() -> list[Location]:
     return cities
 
 
-def geocode_cities(dutch_cities: list[Location], geocoding_api_client: GeocodingApiClient) -> dict[str, Location]:
+def geocode_cities(dutch_cities: list[Location],
+                   geocoding_api_client: Union[GeocodingApiClient, GazetteerGeocoder]) -> dict[str, Location]:
     """
     Get latitude and longitude for all cities using a geocoding API and return as a dictionary.
 
+    The offline GazetteerGeocoder can be passed instead of the API client, it returns the same format.
+
     The API returns data in this format:
     [
       {
@@ -56,7 +61,7 @@ def geocode_cities(dutch_cities: list[Location], geocoding_api_client: Geocoding
 
     Args:
         dutch_cities: List of Location objects representing Dutch cities
-        geocoding_api_client: API client for geocoding service
+        geocoding_api_client: API client for geocoding service, or an offline gazetteer geocoder
 
     Returns:
         Dictionary mapping city names to Location objects with coordinates
@@ -1,15 +1,163 @@
 """
 Utility functions for fetching and processing weather forecast data.
 """
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
 import logging
 
+from src.data_pipeline.ingestion.clients.state import LocalJSONStorage
+from src.data_pipeline.ingestion.configs.constants import FORECAST_DAYS, FORECAST_REFRESH_HOURS, FORECAST_FULL_REFRESH_RUNS
 from src.data_pipeline.ingestion.models.location import Location
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-def fetch_weather_forecasts(geocoded_cities: dict[str, Location], weather_api_client=None) -> list[dict[str, Any]]:
+HOUR_FORMAT = "%Y-%m-%dT%H:%M"
+
+
+def merge_hourly(stored_hourly: dict[str, list], fetched_hourly: dict[str, list], start_time: str) -> dict[str, list]:
+    """
+    Merge a freshly fetched hourly block into a previously stored one.
+
+    Fetched values replace stored values for the same hour, new hours are appended and
+    stored hours before start_time are dropped.
+
+    Args:
+        stored_hourly: Previously stored "hourly" section
+        fetched_hourly: Newly fetched "hourly" section with the same variables
+        start_time: First hour (YYYY-MM-DDTHH:MM) to keep in the merged block
+
+    Returns:
+        Merged "hourly" section, ordered by time
+    """
+    variables = [key for key in stored_hourly if key != "time"]
+    values_by_time = {}
+
+    for hourly in (stored_hourly, fetched_hourly):
+        for idx, timestamp in enumerate(hourly["time"]):
+            if timestamp >= start_time:
+                values_by_time[timestamp] = [hourly[variable][idx] for variable in variables]
+
+    times = sorted(values_by_time)
+    merged = {"time": times}
+    for var_idx, variable in enumerate(variables):
+        merged[variable] = [values_by_time[timestamp][var_idx] for timestamp in times]
+
+    return merged
+
+
+def _delta_windows(last_time: datetime, now_hour: datetime, horizon_end: datetime,
+                   refresh_hours: int) -> list[tuple[datetime, datetime]]:
+    """Work out which (start, end) hour windows have to be fetched to bring a stored forecast up to date."""
+    refresh_end = min(now_hour + timedelta(hours=max(refresh_hours, 1) - 1), horizon_end)
+    new_start = last_time + timedelta(hours=1)
+
+    if new_start > horizon_end:
+        return [(now_hour, refresh_end)]
+    if new_start <= refresh_end + timedelta(hours=1):
+        return [(now_hour, horizon_end)]
+    return [(now_hour, refresh_end), (new_start, horizon_end)]
+
+
+def _full_forecast(location: Location, weather_api_client, forecast_days: int,
+                   fetched_at: str) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Fetch the full forecast window and build its delta state, with every hour fetched now."""
+    weather_data = weather_api_client.get_weather_forecast(
+        latitude=location.latitude,
+        longitude=location.longitude,
+        forecast_days=forecast_days
+    )
+    hourly = weather_data.get("hourly") if isinstance(weather_data, dict) else None
+    hours = len(hourly.get("time", [])) if isinstance(hourly, dict) else 0
+    return weather_data, {"forecast": weather_data, "fetched_at": [fetched_at] * hours, "delta_runs": 0}
+
+
+def fetch_weather_forecast_delta(location: Location, weather_api_client, stored: Optional[dict[str, Any]],
+                                 forecast_days: int = FORECAST_DAYS,
+                                 refresh_hours: int = FORECAST_REFRESH_HOURS,
+                                 full_refresh_runs: int = FORECAST_FULL_REFRESH_RUNS
+                                 ) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Fetch only the new or updated part of a forecast and merge it with the stored forecast.
+
+    The next refresh_hours hours are always re-fetched, because near-term forecasts change
+    between model runs. Hours beyond the end of the stored forecast are fetched as they enter
+    the forecast horizon. Hours in between keep their stored values, so after full_refresh_runs
+    delta runs the full forecast window is fetched again. The full window is also fetched when
+    there is no usable stored forecast.
+
+    The delta state holds the merged forecast, the UTC time each hour was fetched ("fetched_at",
+    aligned with hourly.time) and the number of delta runs since the last full fetch. It is kept
+    in the state store only, the returned forecast has the same format as the API response.
+
+    Args:
+        location: Location object with coordinates
+        weather_api_client: API client for weather service
+        stored: Delta state of the previous run for this location, or None
+        forecast_days: Number of days the forecast window covers
+        refresh_hours: Number of upcoming hours that are always re-fetched
+        full_refresh_runs: Number of consecutive delta runs before the full window is fetched again
+
+    Returns:
+        Tuple of the weather forecast data covering the full forecast window and the new delta state
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    fetched_at = now.isoformat(timespec='seconds')
+    now_hour = now.replace(minute=0, second=0, microsecond=0)
+    day_start = now_hour.replace(hour=0)
+    horizon_end = day_start + timedelta(days=forecast_days) - timedelta(hours=1)
+
+    stored_forecast = stored.get("forecast") if stored else None
+    stored_hourly = stored_forecast.get("hourly") if isinstance(stored_forecast, dict) else None
+    if not isinstance(stored_hourly, dict) or not stored_hourly.get("time") \
+            or stored_hourly["time"][-1] < now_hour.strftime(HOUR_FORMAT):
+        return _full_forecast(location, weather_api_client, forecast_days, fetched_at)
+
+    delta_runs = stored.get("delta_runs", 0)
+    if delta_runs >= full_refresh_runs:
+        logger.info(f"Refreshing the full forecast window for {location.city_name} after {delta_runs} delta runs")
+        return _full_forecast(location, weather_api_client, forecast_days, fetched_at)
+
+    stored_fetched_at = stored.get("fetched_at") or []
+    if len(stored_fetched_at) != len(stored_hourly["time"]):
+        stored_fetched_at = [None] * len(stored_hourly["time"])
+    fetched_at_by_time = dict(zip(stored_hourly["time"], stored_fetched_at))
+
+    last_time = datetime.strptime(stored_hourly["time"][-1], HOUR_FORMAT)
+    weather_data = stored_forecast
+    merged_hourly = stored_hourly
+
+    for start, end in _delta_windows(last_time, now_hour, horizon_end, refresh_hours):
+        logger.debug(f"Fetching forecast delta for {location.city_name} from {start} to {end}")
+        fetched = weather_api_client.get_weather_forecast(
+            latitude=location.latitude,
+            longitude=location.longitude,
+            start_hour=start.strftime(HOUR_FORMAT),
+            end_hour=end.strftime(HOUR_FORMAT)
+        )
+
+        fetched_hourly = fetched.get("hourly") if isinstance(fetched, dict) else None
+        if not isinstance(fetched_hourly, dict) or set(fetched_hourly) != set(merged_hourly):
+            logger.warning(f"Forecast delta for {location.city_name} does not match the stored forecast, "
+                           f"fetching the full window")
+            return _full_forecast(location, weather_api_client, forecast_days, fetched_at)
+
+        merged_hourly = merge_hourly(merged_hourly, fetched_hourly, day_start.strftime(HOUR_FORMAT))
+        fetched_at_by_time.update((timestamp, fetched_at) for timestamp in fetched_hourly["time"])
+        weather_data = fetched
+
+    weather_data["hourly"] = merged_hourly
+    state = {
+        "forecast": weather_data,
+        "fetched_at": [fetched_at_by_time.get(timestamp) for timestamp in merged_hourly["time"]],
+        "delta_runs": delta_runs + 1
+    }
+    return weather_data, state
+
+
+def fetch_weather_forecasts(geocoded_cities: dict[str, Location], weather_api_client=None,
+                            forecast_state: Optional[LocalJSONStorage] = None,
+                            refresh_hours: int = FORECAST_REFRESH_HOURS) -> list[dict[str, Any]]:
     """
     Fetch raw weather forecast data from weather API for geocoded cities.
 
@@ -28,9 +176,17 @@ def fetch_weather_forecasts(geocoded_cities: dict[str, Location], weather_api_cl
       }
     }
 
+    When forecast_state is given, the fetch runs in delta mode: the last forecast per location is
+    kept in the state store and only the new or updated hours are requested from the API, see
+    fetch_weather_forecast_delta.
+
     Args:
         geocoded_cities: Dictionary mapping city names to Location objects with coordinates
         weather_api_client: API client for weather service
+        forecast_state: Optional local store with the delta state per location, enables delta mode.
+            Its directory must survive between runs (a persistent volume on Kubernetes), otherwise
+            every run falls back to a full fetch.
+        refresh_hours: Number of upcoming hours that are always re-fetched in delta mode
 
     Returns:
         List of weather forecast data dictionaries
@@ -48,10 +204,20 @@ def fetch_weather_forecasts(geocoded_cities: dict[str, Location], weather_api_cl
                 continue
 
             logger.info(f"Fetching weather for {city_key} at coordinates: {location.latitude}, {location.longitude}")
-            weather_data = weather_api_client.get_weather_forecast(
-                latitude=location.latitude,
-                longitude=location.longitude
-            )
+            state_key = f"forecast/{city_key.lower().replace(' ', '_')}.json"
+            delta_state = None
+            if forecast_state is not None:
+                weather_data, delta_state = fetch_weather_forecast_delta(
+                    location,
+                    weather_api_client,
+                    stored=forecast_state.get(state_key),
+                    refresh_hours=refresh_hours
+                )
+            else:
+                weather_data = weather_api_client.get_weather_forecast(
+                    latitude=location.latitude,
+                    longitude=location.longitude
+                )
 
             # Check if weather_data is valid and has the expected structure
             if weather_data and isinstance(weather_data, dict):
@@ -63,6 +229,10 @@ def fetch_weather_forecasts(geocoded_cities: dict[str, Location], weather_api_cl
                         break
 
                 if has_valid_data:
+                    # Keep the forecast as the base for the next delta fetch
+                    if delta_state is not None:
+                        forecast_state.store(delta_state, state_key)
+
                     # Add city name to the weather data for reference
                     weather_data["city_name"] = city_key
 
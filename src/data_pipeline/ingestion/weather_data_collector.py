@@ -3,28 +3,53 @@ Weather Data Collector - Entry point
 """
 import logging
 from typing import Any
-from datetime import datetime
+from datetime import date, datetime
 
-from src.data_pipeline.ingestion.clients.weather import GeocodingApiClient, WeatherApiClient
+from src.data_pipeline.ingestion.clients.weather import GeocodingApiClient, WeatherApiClient, WeatherArchiveApiClient
 from src.data_pipeline.ingestion.clients.storage import ScalewayJSONStorage
+from src.data_pipeline.ingestion.clients.state import LocalJSONStorage
+from src.data_pipeline.ingestion.clients.spool import WeatherSpool, SpoolUploader
+from src.data_pipeline.ingestion.clients.gazetteer import GazetteerGeocoder
 from src.data_pipeline.ingestion.models.scaleway_storage import ScalewayStorageConfig
 from src.data_pipeline.ingestion.models.location import Location
 from src.data_pipeline.ingestion.configs.constants import *
 from src.data_pipeline.ingestion.utils.city_utils import get_dutch_cities, geocode_cities
 from src.data_pipeline.ingestion.utils.weather_utils import fetch_weather_forecasts
+from src.data_pipeline.ingestion.utils.backfill_utils import RateLimiter, build_backfill_units, run_backfill
+from src.data_pipeline.ingestion.utils.cdc_utils import prepare_weather_cdc, save_weather_cdc_state
+
+STORAGE_MODES = ("full", "cdc")
 
 
 class WeatherDataCollector:
     """Collects weather data for specified locations"""
 
-    def __init__(self, use_object_store: bool = True):
+    def __init__(self, use_object_store: bool = True, delta_mode: bool = False, use_spool: bool = False,
+                 storage_mode: str = "full"):
         self.logger = logging.getLogger(__name__)
+        if storage_mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode '{storage_mode}', expected one of {STORAGE_MODES}")
+
         # Initialize API clients
         self.geocoding_client = GeocodingApiClient(
             api_key=GEOCODING_API_KEY,
             api_url=GEOCODING_API_URL
         )
+        # Geocode from a local gazetteer when one is configured, falling back to the API on misses
+        if GAZETTEER_FILE:
+            try:
+                self.geocoding_client = GazetteerGeocoder(
+                    gazetteer_file=GAZETTEER_FILE,
+                    fallback_client=self.geocoding_client
+                )
+                self.logger.info(f"Initialized offline geocoder from {GAZETTEER_FILE}")
+            except Exception as e:
+                self.logger.error(f"Failed to load gazetteer {GAZETTEER_FILE}, using geocoding API: {str(e)}")
         self.weather_client = WeatherApiClient(api_url=WEATHER_API_URL)
+        self.archive_client = WeatherArchiveApiClient(api_url=WEATHER_ARCHIVE_API_URL)
+
+        # In delta mode the last forecast per location is kept locally and only new or updated hours are fetched
+        self.forecast_state = LocalJSONStorage(base_dir=FORECAST_STATE_DIR) if delta_mode else None
 
         # Initialize Scaleway Object Store client
         self.use_object_store = use_object_store
@@ -42,6 +67,22 @@ class WeatherDataCollector:
                 self.logger.error(f"Failed to initialize Scaleway JSON Storage client: {str(e)}")
                 self.use_object_store = False
 
+        # In CDC mode only changed forecast values are stored, diffed against the previous forecast kept locally
+        # (or rebuilt from the bucket when the local state is missing)
+        self.cdc_state = LocalJSONStorage(base_dir=CDC_STATE_DIR) if storage_mode == "cdc" else None
+
+        # Writes go to a local spool that is drained to object storage in the background
+        self.spool_uploader = None
+        if self.use_object_store and use_spool:
+            self.spool_uploader = SpoolUploader(
+                spool=WeatherSpool(spool_dir=SPOOL_DIR),
+                storage_client=self.storage_client,
+                max_workers=SPOOL_UPLOAD_WORKERS,
+                max_retries=SPOOL_MAX_RETRIES
+            )
+            self.spool_uploader.start()
+            self.logger.info(f"Spooling weather data to {SPOOL_DIR}")
+
     def collect_weather_data(self, locations: list[Location]) -> list[dict[str, Any]]:
         """
         Collect weather data for a list of locations
@@ -68,7 +109,11 @@ class WeatherDataCollector:
 
             # Step 2: Get weather forecast data for all geocoded locations
             self.logger.info("Fetching weather forecasts...")
-            weather_forecasts = fetch_weather_forecasts(geocoded_cities, self.weather_client)
+            weather_forecasts = fetch_weather_forecasts(
+                geocoded_cities,
+                self.weather_client,
+                forecast_state=self.forecast_state
+            )
 
             if not weather_forecasts:
                 self.logger.error("Failed to fetch any weather forecasts")
@@ -101,11 +146,7 @@ class WeatherDataCollector:
                     # Store to Scaleway Object Store if client is available
                     if self.use_object_store and hasattr(self, 'storage_client'):
                         try:
-                            stored = self.storage_client.store_weather(city_name, result)
-                            if stored:
-                                self.logger.info(f"Successfully stored weather data for {city_name} in Scaleway JSON Storage")
-                            else:
-                                self.logger.warning(f"Failed to store weather data for {city_name} in Scaleway JSON Storage")
+                            self._store_result(city_name, result)
                         except Exception as e:
                             self.logger.error(f"Error storing weather data for {city_name}: {str(e)}")
 
@@ -118,22 +159,118 @@ class WeatherDataCollector:
         self.logger.info(f"Weather data collection complete. Processed {len(results)} locations successfully.")
         return results
 
+    def _store_result(self, city_name: str, result: dict[str, Any]) -> None:
+        """
+        Store a result in Scaleway, either directly or through the spool
+
+        In CDC mode only a change record (or a periodic full snapshot) is stored instead of the full result.
+
+        Args:
+            city_name: Name of the city
+            result: Formatted weather result for the city
+        """
+        cdc_state = None
+        if self.cdc_state is not None:
+            captured_at = datetime.now()
+            record_type, record, cdc_state = prepare_weather_cdc(
+                self.cdc_state, city_name, result, CDC_SNAPSHOT_INTERVAL, captured_at=captured_at,
+                storage_client=self.storage_client, lookback_days=CDC_REBUILD_LOOKBACK_DAYS
+            )
+            if record is None:
+                self.logger.info(f"No forecast changes for {city_name}, nothing to store")
+                return
+            key = self.storage_client.weather_cdc_key(city_name, record_type, captured_at)
+        else:
+            key, record = self.storage_client.weather_key(city_name), result
+
+        if self.spool_uploader is not None:
+            self.spool_uploader.put(key, record)
+            stored = True
+        else:
+            stored = self.storage_client.store(record, key)
+
+        if stored:
+            if cdc_state is not None:
+                save_weather_cdc_state(self.cdc_state, city_name, cdc_state)
+            self.logger.info(f"Successfully stored weather data for {city_name} in Scaleway JSON Storage")
+        else:
+            self.logger.warning(f"Failed to store weather data for {city_name} in Scaleway JSON Storage")
+
+    def close(self) -> int:
+        """
+        Flush spooled weather data to object storage before shutting down
+
+        Returns:
+            Number of records that could not be uploaded and are left in the spool
+        """
+        if self.spool_uploader is not None:
+            return self.spool_uploader.close()
+        return 0
+
+    def backfill_weather_data(
+            self,
+            locations: list[Location],
+            start_date: date,
+            end_date: date,
+            chunk_days: int = BACKFILL_CHUNK_DAYS,
+            max_workers: int = BACKFILL_MAX_WORKERS,
+            requests_per_second: float = BACKFILL_REQUESTS_PER_SECOND,
+            checkpoint_dir: str = BACKFILL_CHECKPOINT_DIR
+    ) -> dict[str, int]:
+        """
+        Backfill historical weather data for a list of locations
+
+        The range is split into (location, date-chunk) units that are fetched in parallel
+        under a global rate limit. Completed units are checkpointed locally, so calling this
+        again with the same arguments resumes an interrupted backfill.
+
+        Args:
+            locations: list of Location objects
+            start_date: First day of the backfill (inclusive)
+            end_date: Last day of the backfill (inclusive)
+            chunk_days: Maximum number of days fetched per request
+            max_workers: Number of requests running concurrently
+            requests_per_second: Global request rate limit across all workers
+            checkpoint_dir: Local directory to store backfill progress in
+
+        Returns:
+            Dictionary with counts of completed, skipped and failed units and stored days
+        """
+        if not (self.use_object_store and hasattr(self, 'storage_client')):
+            raise RuntimeError("Backfill requires Scaleway JSON Storage to be configured")
+
+        self.logger.info(f"Starting weather backfill from {start_date} to {end_date} for {len(locations)} locations")
 
-def main(locations_file: str = None):
+        geocoded_cities = geocode_cities(locations, self.geocoding_client)
+        if not geocoded_cities:
+            self.logger.error("Failed to geocode any locations")
+            return {"completed": 0, "skipped": 0, "failed": 0, "days": 0}
+
+        units = build_backfill_units(list(geocoded_cities.values()), start_date, end_date, chunk_days)
+        checkpoint_store = LocalJSONStorage(base_dir=checkpoint_dir)
+        checkpoint_key = f"backfill_{start_date.isoformat()}_{end_date.isoformat()}.json"
+
+        return run_backfill(
+            units=units,
+            archive_client=self.archive_client,
+            storage_client=self.storage_client,
+            checkpoint_store=checkpoint_store,
+            checkpoint_key=checkpoint_key,
+            max_workers=max_workers,
+            rate_limiter=RateLimiter(requests_per_second)
+        )
+
+
+def load_locations(locations_file: str = None) -> list[Location]:
     """
-    Main entry point for the weather data collector
+    Load the locations to collect weather data for
 
     Args:
         locations_file: Path to file with locations (optional)
 
     Returns:
-        list of weather data for each location
+        list of Location objects
     """
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
     logger = logging.getLogger(__name__)
 
     # Default locations file if not provided
@@ -169,9 +306,42 @@ def main(locations_file: str = None):
             Location(city_name="Utrecht", country="NL")
         ]
 
+    return locations
+
+
+def main(locations_file: str = None, delta_mode: bool = False, use_spool: bool = False,
+         storage_mode: str = "full"):
+    """
+    Main entry point for the weather data collector
+
+    Args:
+        locations_file: Path to file with locations (optional)
+        delta_mode: Only fetch new or updated forecast hours since the previous run
+        use_spool: Write to a local spool that is uploaded in the background
+        storage_mode: "full" to store every forecast, "cdc" to store only changed forecast values
+
+    Returns:
+        list of weather data for each location
+    """
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    locations = load_locations(locations_file)
+
     # Collect weather data
-    collector = WeatherDataCollector()
-    results = collector.collect_weather_data(locations)
+    collector = WeatherDataCollector(delta_mode=delta_mode, use_spool=use_spool, storage_mode=storage_mode)
+    try:
+        results = collector.collect_weather_data(locations)
+    finally:
+        left_in_spool = collector.close()
+
+    # Fail the task so Airflow retries, the retry replays the records left in the spool
+    if left_in_spool:
+        raise RuntimeError(f"{left_in_spool} weather records could not be uploaded and are left in {SPOOL_DIR}")
 
     # Print storage information
     if results:
@@ -180,7 +350,8 @@ def main(locations_file: str = None):
         if collector.use_object_store and hasattr(collector, 'storage_client'):
             print(f"Data stored in Scaleway Object Storage:")
             print(f"  - Bucket: {collector.storage_client.config.bucket_name}")
-            print(f"  - Path: weather/{today}/")
+            prefix = "weather_cdc" if storage_mode == "cdc" else "weather"
+            print(f"  - Path: {prefix}/{today}/")
             city_list = ", ".join([result["location"]["city"] for result in results[:5]])
             if len(results) > 5:
                 city_list += f", and {len(results) - 5} more"
@@ -188,4 +359,40 @@ def main(locations_file: str = None):
         else:
             print("Data was not stored in Scaleway (storage disabled or configuration error)")
 
-    return results
\ No newline at end of file
+    return results
+
+
+def backfill(start_date: str, end_date: str, locations_file: str = None) -> dict[str, int]:
+    """
+    Entry point for backfilling historical weather data
+
+    Args:
+        start_date: First day of the backfill (YYYY-MM-DD, inclusive)
+        end_date: Last day of the backfill (YYYY-MM-DD, inclusive)
+        locations_file: Path to file with locations (optional)
+
+    Returns:
+        Dictionary with counts of completed, skipped and failed units and stored days
+    """
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    locations = load_locations(locations_file)
+
+    collector = WeatherDataCollector()
+    summary = collector.backfill_weather_data(
+        locations,
+        start_date=date.fromisoformat(start_date),
+        end_date=date.fromisoformat(end_date)
+    )
+
+    print(f"Backfill from {start_date} to {end_date} finished: {summary['completed']} units completed, "
+          f"{summary['skipped']} skipped, {summary['failed']} failed, {summary['days']} days stored.")
+    if summary["failed"]:
+        print("Re-run the backfill with the same arguments to retry the failed units.")
+    print("  - Path: weather_history/")
+
+    return summary
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from src.data_pipeline.ingestion.clients.state import LocalJSONStorage
+from src.data_pipeline.ingestion.utils.cdc_utils import prepare_weather_cdc
+
+
+class StubStorage:
+    """Object storage stub that keeps stored objects in memory."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def store(self, data, key):
+        self.objects[key] = data
+        return True
+
+    def get(self, key):
+        return self.objects.get(key)
+
+    def list(self, prefix=""):
+        return [key for key in self.objects if key.startswith(prefix)]
+
+    def weather_cdc_prefix(self, city, date):
+        return f"weather_cdc/{date}/{city.lower()}/"
+
+    def weather_cdc_key(self, city, record_type, captured_at):
+        return f"{self.weather_cdc_prefix(city, captured_at.strftime('%Y-%m-%d'))}{captured_at.strftime('%H%M%S')}_{record_type}.json"
+
+
+def forecast(times, temperatures):
+    return {"location": {"city": "Utrecht"}, "weather_data": {"hourly": {"time": times, "temperature_2m": temperatures}}}
+
+
+def capture(state_dir, storage, result, captured_at):
+    state_store = LocalJSONStorage(base_dir=str(state_dir))
+    record_type, record, state = prepare_weather_cdc(state_store, "Utrecht", result, snapshot_interval=24,
+                                                     captured_at=captured_at, storage_client=storage)
+    if record is not None:
+        storage.store(record, storage.weather_cdc_key("Utrecht", record_type, captured_at))
+    state_store.store(state, "cdc/utrecht.json")
+    return record_type, record
+
+
+def test_missing_local_state_is_rebuilt_from_bucket(tmp_path):
+    storage = StubStorage()
+    # Every run gets a fresh local state directory, as on an ephemeral pod
+    capture(tmp_path / "run1", storage, forecast(["T00", "T01"], [1.0, 2.0]), datetime(2026, 1, 1, 23))
+    capture(tmp_path / "run2", storage, forecast(["T01", "T02"], [2.5, 3.0]), datetime(2026, 1, 2, 1))
+
+    record_type, record = capture(tmp_path / "run3", storage, forecast(["T02", "T03"], [3.0, 4.0]),
+                                  datetime(2026, 1, 2, 2))
+
+    assert record_type == "changes"
+    assert record["changes"] == [["T03", "temperature_2m", 4.0]]
+    assert record["forecast_start"] == "T02"
+    assert sum(key.endswith("_snapshot.json") for key in storage.objects) == 1
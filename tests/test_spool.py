@@ -0,0 +1,57 @@
+from src.data_pipeline.ingestion.clients.spool import SpoolUploader, WeatherSpool
+
+
+class StubStorage:
+    """Object storage stub that keeps stored objects in memory and can reject given payloads."""
+
+    def __init__(self, reject=()):
+        self.objects = {}
+        self.reject = set(reject)
+
+    def store(self, data, key):
+        if data.get("version") in self.reject:
+            return False
+        self.objects[key] = data
+        return True
+
+
+def run_uploader(spool, storage, records=()):
+    uploader = SpoolUploader(spool, storage, max_workers=1, max_retries=1, retry_backoff=0)
+    uploader.start()
+    for key, data in records:
+        uploader.put(key, data)
+    return uploader, uploader.close()
+
+
+def test_failed_record_replayed_after_newer_upload_is_dropped(tmp_path):
+    spool = WeatherSpool(str(tmp_path))
+
+    # First run: the old record fails and stays in the spool, the newer one is uploaded
+    storage = StubStorage(reject={"old"})
+    _, left = run_uploader(spool, storage, [("k", {"version": "old"}), ("k", {"version": "new"})])
+    assert left == 1
+    assert storage.objects == {"k": {"version": "new"}}
+
+    # Second run: replaying the old record must not roll the object back
+    storage = StubStorage()
+    storage.objects = {"k": {"version": "new"}}
+    uploader, left = run_uploader(spool, storage)
+    assert left == 0
+    assert storage.objects == {"k": {"version": "new"}}
+    assert uploader.uploaded == 0
+    assert spool.pending() == []
+
+
+def test_corrupt_record_is_quarantined(tmp_path):
+    spool = WeatherSpool(str(tmp_path))
+    corrupt = tmp_path / "1-corrupt.json.gz"
+    corrupt.write_bytes(b"not gzip")
+
+    storage = StubStorage()
+    uploader, left = run_uploader(spool, storage, [("k", {"version": "new"})])
+
+    assert left == 0
+    assert uploader.failed == 1
+    assert not corrupt.exists()
+    assert (tmp_path / "1-corrupt.json.gz.corrupt").exists()
+    assert storage.objects == {"k": {"version": "new"}}